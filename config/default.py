@@ -20,13 +20,15 @@ def get_config():
     # Dataset
     cfg.data_dir = os.path.abspath(os.path.join(cfg.root_dir, "data"))
     cfg.dataset_type = "default"  # default or imagefolder
-    cfg.batch_size = 4
+    cfg.batch_size = 256
     cfg.num_workers = 4
     cfg.pin_memory = True
+    cfg.gpu_preload = False  # keep the whole dataset on the GPU, no workers
+    cfg.gpu_decode = False  # decode JPEGs on the GPU (imagefolder only)
     cfg.num_classes = 100
     cfg.val_size = 0.1
     cfg.img_size = 224  # desired image size, not actual image size
-    cfg.transform_set = "default"
+    cfg.transform_set = "default"  # default, imagenet, cifar, svhn, basic, gpu
 
     # CIFAR-100 Original
     # Mean: tensor([0.5071, 0.4867, 0.4408])
@@ -46,5 +48,10 @@ def get_config():
     cfg.num_epochs = 40
     cfg.lr = 0.0005
     cfg.weight_decay = 0.005
+    cfg.label_smoothing = 0.1
+    cfg.precision = "bf16-mixed"
+    # torch.compile with CUDA graphs, only applied when training on CUDA; needs
+    # a fixed batch size, so the val/test tail batches trigger one recompile each
+    cfg.compile = True
 
     return cfg
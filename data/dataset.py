@@ -1,15 +1,140 @@
 """
 Dataset class for CIFAR100.
 """
+import math
 import os
 import pickle
+import tempfile
 
 import numpy as np
 import torch
-from PIL import Image
+import torch.distributed as dist
+import torchvision.transforms.v2 as v2
 from torch.utils.data import Dataset
-from torch.utils.data.dataset import random_split
+from torch.utils.data.dataset import Subset
 from torchvision.datasets import ImageFolder
+from torchvision.io import read_file
+
+from utils import BatchAugment, encoded_collate
+
+
+def _atomic_save(path, save):
+    """
+    Write a file through a temporary file in the same directory, then rename
+    it into place, so concurrent readers (e.g. other DDP ranks) never see a
+    partially written file.
+
+    Args:
+        path (string): Path of the file to write.
+        save (callable): Function writing the contents to a binary file object.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            save(f)
+        # mkstemp creates the file as 0600, give it the mode open() would
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _ensure_npy_cache(root, name):
+    """
+    Convert a CIFAR100 pickle split into raw .npy files, if not already done.
+
+    The images are stored as a C-contiguous uint8 array in HWC layout, so
+    later loads can memory-map them instead of unpickling and transposing.
+
+    Args:
+        root (string): Root directory of dataset.
+        name (string): Name of the split (train or test).
+    Returns:
+        tuple: (data_path, labels_path)
+    """
+    base = os.path.join(root, "cifar-100-python")
+    data_path = os.path.join(base, f"{name}.npy")
+    labels_path = os.path.join(base, f"{name}_labels.npy")
+
+    if os.path.exists(data_path) and os.path.exists(labels_path):
+        return data_path, labels_path
+
+    path = os.path.join(base, name)
+    with open(path, "rb") as f:
+        entry = pickle.load(f, encoding="latin1")
+    data = entry["data"]
+    labels = entry["fine_labels"]
+
+    # the pickled array is already (N, 3072) uint8, reshape it without copying
+    data = np.asarray(data, dtype=np.uint8).reshape(-1, 3, 32, 32)
+    data = np.ascontiguousarray(data.transpose((0, 2, 3, 1)))
+
+    _atomic_save(labels_path, lambda f: np.save(f, np.asarray(labels, np.int64)))
+    _atomic_save(data_path, lambda f: np.save(f, data))
+
+    return data_path, labels_path
+
+
+def _get_split_indices(root, num_samples, val_size, seed=42):
+    """
+    Get a fixed train/val split of `num_samples` indices.
+
+    The seeded permutation is cached in `root/val_split.pt`, so every run and
+    process sees the same split; it is regenerated if the number of samples
+    or the seed changes.
+
+    Args:
+        root (string): Directory the permutation is cached in.
+        num_samples (int): Number of samples to split.
+        val_size (float): Proportion of the samples in the validation split.
+        seed (int, optional): Seed of the permutation.
+    Returns:
+        tuple: (train_indices, val_indices)
+    """
+    path = os.path.join(root, "val_split.pt")
+    split = torch.load(path) if os.path.exists(path) else None
+
+    if split is None or (split["num_samples"], split["seed"]) != (num_samples, seed):
+        generator = torch.Generator().manual_seed(seed)
+        split = {
+            "num_samples": num_samples,
+            "seed": seed,
+            "perm": torch.randperm(num_samples, generator=generator),
+        }
+        _atomic_save(path, lambda f: torch.save(split, f))
+
+    train_size = num_samples - int(num_samples * val_size)
+    return split["perm"][:train_size], split["perm"][train_size:]
+
+
+def _strip_tensor_conversions(transform):
+    """
+    Drop the leading steps of a v2.Compose that only convert the input to an
+    uint8 image tensor, since CIFAR100 samples already are one.
+
+    Args:
+        transform (callable): A function/transform, possibly a v2.Compose.
+    Returns:
+        callable: The transform without the leading conversions, or None if
+        nothing is left.
+    """
+    if not isinstance(transform, v2.Compose):
+        return transform
+
+    def is_conversion(t):
+        if isinstance(t, v2.ToDtype):
+            return t.dtype == torch.uint8
+        # ToPureTensor was added in torchvision 0.17
+        return isinstance(t, (v2.ToImage, getattr(v2, "ToPureTensor", ())))
+
+    transforms = list(transform.transforms)
+    while transforms and is_conversion(transforms[0]):
+        transforms.pop(0)
+
+    return v2.Compose(transforms) if transforms else None
 
 
 class CIFAR100(Dataset):
@@ -23,24 +148,38 @@ class CIFAR100(Dataset):
     │   ├── test
     └── └── train
 
+    On first use, each split is converted to `<split>.npy` and
+    `<split>_labels.npy` next to the pickles. The images are then served from
+    the memory-mapped cache, paged in as they are read. With `share_memory`,
+    they are instead read into a shared-memory tensor (one full read of the
+    split per construction), which DataLoader workers receive by file
+    descriptor instead of a pickled copy. Samples are returned as uint8
+    (C, H, W) tensor views; no PIL image is created.
+
     Args:
         root (string): Root directory of dataset.
         train (bool, optional): If True, creates dataset from training set,
         otherwise creates from test set.
         transform (callable, optional): A function/transform that takes in an
-        PIL image and returns a transformed version.
+        uint8 (C, H, W) tensor and returns a transformed version. Leading
+        ToImage / ToDtype(torch.uint8) steps are skipped, as they are no-ops.
+        share_memory (bool, optional): If True, move the split to shared memory,
+        for use by DataLoader workers.
     """
 
-    def __init__(self, root, train=True, transform=None):
+    def __init__(self, root, train=True, transform=None, share_memory=False):
         self.root = os.path.expanduser(root)
         self.train = train
-        self.transform = transform
+        self.transform = _strip_tensor_conversions(transform)
 
-        if self.train:
-            self.train_data, self.train_labels = self._load_data("train")
-        else:
-            self.test_data, self.test_labels = self._load_data("test")
+        data, self.labels = self._load_data("train" if self.train else "test")
 
+        # the memmap itself is not kept, as it would pickle as a full array copy
+        self.data_t = torch.from_numpy(data)
+        if share_memory:
+            # shared-memory tensors are passed to workers by file descriptor
+            self.data_t.share_memory_()
+            self.labels.share_memory_()
         self.classes = self._load_meta()["fine_label_names"]
 
     def __getitem__(self, index):
@@ -50,12 +189,7 @@ class CIFAR100(Dataset):
         Returns:
             tuple: (image, target) where target is index of the target class.
         """
-        if self.train:
-            img, target = self.train_data[index], self.train_labels[index]
-        else:
-            img, target = self.test_data[index], self.test_labels[index]
-
-        img = Image.fromarray(img)
+        img, target = self.data_t[index].permute(2, 0, 1), self.labels[index]
 
         if self.transform is not None:
             img = self.transform(img)
@@ -63,10 +197,7 @@ class CIFAR100(Dataset):
         return img, target
 
     def __len__(self):
-        if self.train:
-            return len(self.train_data)
-        else:
-            return len(self.test_data)
+        return len(self.data_t)
 
     def _load_data(self, name):
         """
@@ -74,21 +205,12 @@ class CIFAR100(Dataset):
         Args:
             name (string): Name of directory.
         Returns:
-            tuple: (data, labels)
+            tuple: (data, labels) where labels is an int64 tensor.
         """
-        path = os.path.join(self.root, "cifar-100-python", name)
-        data = []
-        labels = []
-        with open(path, "rb") as f:
-            if name == "train":
-                entry = pickle.load(f, encoding="latin1")
-            else:
-                entry = pickle.load(f, encoding="latin1")
-            data = entry["data"]
-            labels = entry["fine_labels"]
-
-        data = np.vstack(data).reshape(-1, 3, 32, 32)
-        data = data.transpose((0, 2, 3, 1))
+        data_path, labels_path = _ensure_npy_cache(self.root, name)
+        # copy-on-write mapping: pages stay shared, but torch gets a writable view
+        data = np.load(data_path, mmap_mode="c")
+        labels = torch.from_numpy(np.load(labels_path))
 
         return data, labels
 
@@ -104,8 +226,206 @@ class CIFAR100(Dataset):
             return entry
 
 
+def _get_rank_and_world_size():
+    """
+    Get the rank and world size of the current process, from torch.distributed
+    if it is initialized, otherwise from the launcher's environment variables.
+    """
+    if dist.is_available() and dist.is_initialized():
+        return dist.get_rank(), dist.get_world_size()
+    return int(os.getenv("RANK", "0")), int(os.getenv("WORLD_SIZE", "1"))
+
+
+class GPUCIFAR100:
+    """
+    CIFAR100 split preloaded onto a device and iterated in batches.
+
+    The whole split is uploaded once as an uint8 (N, 3, 32, 32) tensor, so
+    there are no worker processes, pinned buffers or per-step host-to-device
+    copies. Batches are produced by index slicing on the device, then
+    augmented and normalized by `BatchAugment`, i.e. the same way as batches
+    of the "gpu" transform set. No other augmentation is applied.
+
+    Under distributed training, each process iterates over its own shard of
+    the samples, like with a DistributedSampler. The shuffling permutation is
+    seeded by (seed + epoch), so it is the same on every process and the
+    shards are disjoint.
+
+    Args:
+        data (torch.Tensor): uint8 (N, 32, 32, 3) images, e.g. CIFAR100.data_t.
+        labels (torch.Tensor): Labels of the images, of shape (N,).
+        batch_size (int, optional): Number of samples per batch.
+        shuffle (bool, optional): If True, reshuffle the data every epoch.
+        augment (bool, optional): If True, apply random crop and flip.
+        img_size (int, optional): Size the batches are resized to.
+        mean (sequence, optional): Per-channel mean used for normalization.
+        std (sequence, optional): Per-channel std used for normalization.
+        device (string or torch.device, optional): Device to preload onto.
+        drop_last (bool, optional): If True, drop the last incomplete batch
+        (and the samples that do not divide evenly across processes).
+        padding (int, optional): Padding used by the random crop.
+        seed (int, optional): Seed of the per-epoch shuffling.
+    """
+
+    def __init__(
+        self,
+        data,
+        labels,
+        batch_size=128,
+        shuffle=False,
+        augment=False,
+        img_size=32,
+        mean=(0.5071, 0.4867, 0.4408),
+        std=(0.2675, 0.2565, 0.2761),
+        device="cuda",
+        drop_last=False,
+        padding=4,
+        seed=42,
+    ):
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.device = torch.device(device)
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+
+        # cropped before normalization, so the padding is black
+        self.batch_aug = BatchAugment(img_size, mean, std, padding)
+        self.batch_aug.to(self.device).train(augment)
+
+        self.data = data.to(self.device).permute(0, 3, 1, 2).contiguous()
+        self.labels = labels.to(self.device, dtype=torch.long)
+
+    @classmethod
+    def from_root(cls, root, train=True, indices=None, **kwargs):
+        """
+        Preload a CIFAR100 split from disk.
+
+        Args:
+            root (string): Root directory of dataset.
+            train (bool, optional): If True, uses the training set, otherwise
+            the test set.
+            indices (sequence, optional): If given, only use these samples.
+            **kwargs: Passed to GPUCIFAR100.
+        Returns:
+            GPUCIFAR100: The preloaded split.
+        """
+        dataset = CIFAR100(root, train=train)
+        data, labels = dataset.data_t, dataset.labels
+        if indices is not None:
+            indices = torch.as_tensor(indices)
+            data, labels = data[indices], labels[indices]
+
+        return cls(data, labels, **kwargs)
+
+    def _shard(self, idx):
+        """
+        Select the samples of the current process from the epoch's indices.
+        """
+        rank, world_size = _get_rank_and_world_size()
+        if self.drop_last:
+            # equal shards, so every process runs the same number of steps
+            idx = idx[: len(idx) - len(idx) % world_size]
+        return idx[rank::world_size]
+
+    def __len__(self):
+        num_samples = len(self._shard(range(len(self.data))))
+        if self.drop_last:
+            return num_samples // self.batch_size
+        return math.ceil(num_samples / self.batch_size)
+
+    def __iter__(self):
+        n = len(self.data)
+        if self.shuffle:
+            generator = torch.Generator().manual_seed(self.seed + self.epoch)
+            idx = torch.randperm(n, generator=generator).to(self.device)
+            self.epoch += 1
+        else:
+            idx = torch.arange(n, device=self.device)
+        idx = self._shard(idx)
+
+        for i in range(len(self)):
+            batch_idx = idx[i * self.batch_size : (i + 1) * self.batch_size]
+            x, y = self.data[batch_idx], self.labels[batch_idx]
+
+            yield self.batch_aug(x), y
+
+
+class EncodedImageFolder(Dataset):
+    """
+    ImageFolder variant that returns the still-encoded image bytes.
+
+    The directory is scanned once and the (path, label) index is cached in
+    `root/index.pt`, so later runs skip the scan. The cache stores the class
+    directories and their modification times, and the directory is rescanned
+    if they change, i.e. when a class or a file directly inside a class
+    directory is added, removed or renamed (changes in nested directories are
+    not detected; delete index.pt in that case). Images are returned as
+    1D uint8 tensors of the file contents, meant to be decoded on the GPU
+    in batches (see `encoded_collate` and `ImageClassifier`). Only JPEG
+    files can be decoded on the GPU.
+
+    Args:
+        root (string): Root directory of the split (root/class_x/xxx.jpg).
+    """
+
+    def __init__(self, root):
+        self.root = os.path.expanduser(root)
+
+        index_path = os.path.join(self.root, "index.pt")
+        signature = self._get_signature()
+        index = torch.load(index_path) if os.path.exists(index_path) else None
+
+        if index is None or index.get("signature") != signature:
+            folder = ImageFolder(self.root)
+            index = {
+                "signature": signature,
+                "classes": folder.classes,
+                "samples": [
+                    (os.path.relpath(path, self.root), target)
+                    for path, target in folder.samples
+                ],
+            }
+            _atomic_save(index_path, lambda f: torch.save(index, f))
+
+        self.classes = index["classes"]
+        self.samples = index["samples"]
+
+    def _get_signature(self):
+        """
+        Get the class directories of the split and their modification times.
+
+        Returns:
+            list: (name, mtime_ns) of every class directory, sorted by name.
+        """
+        with os.scandir(self.root) as entries:
+            return sorted(
+                (entry.name, entry.stat().st_mtime_ns)
+                for entry in entries
+                if entry.is_dir()
+            )
+
+    def __getitem__(self, index):
+        """
+        Args:
+            index (int): Index
+        Returns:
+            tuple: (data, target) where data is the encoded image file.
+        """
+        path, target = self.samples[index]
+        return read_file(os.path.join(self.root, path)), target
+
+    def __len__(self):
+        return len(self.samples)
+
+
 def get_imagefolder_dataset(
-    root, train_transform=None, test_transform=None, val_size=0.1
+    root,
+    train_transform=None,
+    test_transform=None,
+    val_size=0.1,
+    encoded=False,
+    seed=42,
 ):
     """
     Get ImageFolder dataset.
@@ -118,6 +438,9 @@ def get_imagefolder_dataset(
         in an PIL image and returns a transformed version.
         val_size (float, optional): If float, should be between 0.0 and 1.0
         and represent the proportion of the dataset to include in the validation split.
+        encoded (bool, optional): If True, return the encoded image bytes
+        (EncodedImageFolder) for GPU decoding; the transforms are ignored.
+        seed (int, optional): Seed of the cached train/val split.
     Returns:
         tuple: (train_dataset, val_dataset, test_dataset)
     """
@@ -126,41 +449,65 @@ def get_imagefolder_dataset(
     # root/train/class_x/xxx.ext
     # root/test/class_x/xxx.ext
 
-    train_dataset = ImageFolder(os.path.join(root, "train"), transform=train_transform)
-    test_dataset = ImageFolder(os.path.join(root, "test"), transform=test_transform)
+    if encoded:
+        train_dataset = EncodedImageFolder(os.path.join(root, "train"))
+        test_dataset = EncodedImageFolder(os.path.join(root, "test"))
+    else:
+        train_dataset = ImageFolder(
+            os.path.join(root, "train"), transform=train_transform
+        )
+        test_dataset = ImageFolder(os.path.join(root, "test"), transform=test_transform)
 
     if val_size > 0.0:
-        val_size = int(len(train_dataset) * val_size)
-        train_size = len(train_dataset) - val_size
-        train_dataset, val_dataset = random_split(train_dataset, [train_size, val_size])
+        train_indices, val_indices = _get_split_indices(
+            root, len(train_dataset), val_size, seed
+        )
+        val_dataset = Subset(train_dataset, val_indices.tolist())
+        train_dataset = Subset(train_dataset, train_indices.tolist())
     else:
         val_dataset = None
 
     return train_dataset, val_dataset, test_dataset
 
 
-def get_cifar100_dataset(root, train_transform=None, test_transform=None, val_size=0.1):
+def get_cifar100_dataset(
+    root,
+    train_transform=None,
+    test_transform=None,
+    val_size=0.1,
+    seed=42,
+    share_memory=False,
+):
     """
     Get CIFAR100 dataset.
 
     Args:
         root (string): Root directory of dataset.
         train_transform (callable, optional): A function/transform that takes
-        in an PIL image and returns a transformed version.
+        in an uint8 (C, H, W) tensor and returns a transformed version.
         test_transform (callable, optional): A function/transform that takes
-        in an PIL image and returns a transformed version.
+        in an uint8 (C, H, W) tensor and returns a transformed version.
         val_size (float, optional): If float, should be between 0.0 and 1.0
         and represent the proportion of the dataset to include in the validation split.
+        seed (int, optional): Seed of the cached train/val split.
+        share_memory (bool, optional): If True, move the splits to shared
+        memory, for use by DataLoader workers.
     Returns:
         tuple: (train_dataset, val_dataset, test_dataset)
     """
-    train_dataset = CIFAR100(root, train=True, transform=train_transform)
-    test_dataset = CIFAR100(root, train=False, transform=test_transform)
+    train_dataset = CIFAR100(
+        root, train=True, transform=train_transform, share_memory=share_memory
+    )
+    test_dataset = CIFAR100(
+        root, train=False, transform=test_transform, share_memory=share_memory
+    )
 
     if val_size > 0.0:
-        val_size = int(len(train_dataset) * val_size)
-        train_size = len(train_dataset) - val_size
-        train_dataset, val_dataset = random_split(train_dataset, [train_size, val_size])
+        train_indices, val_indices = _get_split_indices(
+            root, len(train_dataset), val_size, seed
+        )
+        val_dataset = Subset(train_dataset, val_indices.tolist())
+        train_dataset = Subset(train_dataset, train_indices.tolist())
     else:
         val_dataset = None
 
@@ -177,56 +524,84 @@ def get_cifar100_loaders(
     shuffle=True,
     dataset_type="default",
     return_steps=False,
+    prefetch_factor=4,
+    decode_on_gpu=False,
+    seed=42,
 ):
     """
     Get CIFAR100 dataset.
 
     Args:
         root (string): Root directory of dataset.
-        train_transform (callable): A function/transform that takes
-        in an PIL image and returns a transformed version.
-        test_transform (callable): A function/transform that takes
-        in an PIL image and returns a transformed version.
+        train_transform (callable): A function/transform that takes in an
+        uint8 (C, H, W) tensor (default dataset) or a PIL image (imagefolder
+        dataset) and returns a transformed version.
+        test_transform (callable): A function/transform that takes in an
+        uint8 (C, H, W) tensor (default dataset) or a PIL image (imagefolder
+        dataset) and returns a transformed version.
         val_size (float, optional): If float, should be between 0.0 and 1.0
         and represent the proportion of the dataset to include in the validation split.
         shuffle (bool, optional): If True, the data will be split randomly.
         return_steps (bool, optional): If True, return number of steps per epoch.
+        prefetch_factor (int, optional): Number of batches loaded in advance by
+        each worker. Workers are kept alive across epochs.
+        decode_on_gpu (bool, optional): If True, the imagefolder loaders yield
+        encoded JPEG bytes to be decoded on the GPU by the model.
+        seed (int, optional): Seed of the cached train/val split.
 
     Returns:
         tuple: (train_dataset, val_dataset, test_dataset)
     """
 
+    if decode_on_gpu and dataset_type != "imagefolder":
+        raise ValueError("GPU decoding is only supported for imagefolder datasets.")
+
     if dataset_type == "default":
         train_dataset, val_dataset, test_dataset = get_cifar100_dataset(
-            root, train_transform, test_transform, val_size
+            root,
+            train_transform,
+            test_transform,
+            val_size,
+            seed=seed,
+            share_memory=num_workers > 0,
         )
     elif dataset_type == "imagefolder":
         train_dataset, val_dataset, test_dataset = get_imagefolder_dataset(
-            root, train_transform, test_transform, val_size
+            root,
+            train_transform,
+            test_transform,
+            val_size,
+            encoded=decode_on_gpu,
+            seed=seed,
         )
     else:
         raise ValueError("Invalid dataset type. Choose from [default, imagefolder].")
 
+    # persistent_workers and prefetch_factor are rejected without workers
+    loader_kwargs = dict(num_workers=num_workers, pin_memory=True)
+    if num_workers > 0:
+        loader_kwargs.update(persistent_workers=True, prefetch_factor=prefetch_factor)
+    if decode_on_gpu:
+        loader_kwargs.update(collate_fn=encoded_collate)
+
     train_loader = torch.utils.data.DataLoader(
         train_dataset,
         batch_size=batch_size,
         shuffle=shuffle,
-        num_workers=num_workers,
-        pin_memory=True,
+        **loader_kwargs,
+        drop_last=True,
     )
     val_loader = torch.utils.data.DataLoader(
         val_dataset,
         batch_size=batch_size,
         shuffle=shuffle,
-        num_workers=num_workers,
-        pin_memory=True,
+        **loader_kwargs,
     )
     test_loader = torch.utils.data.DataLoader(
         test_dataset,
         batch_size=batch_size,
         shuffle=False,
-        num_workers=num_workers,
-        pin_memory=True,
+        **loader_kwargs,
     )
 
     if return_steps:
@@ -234,3 +609,79 @@ def get_cifar100_loaders(
         return train_loader, val_loader, test_loader, steps_per_epoch
     else:
         return train_loader, val_loader, test_loader
+
+
+def get_cifar100_gpu_loaders(
+    root,
+    batch_size=128,
+    val_size=0.1,
+    shuffle=True,
+    img_size=32,
+    mean=(0.5071, 0.4867, 0.4408),
+    std=(0.2675, 0.2565, 0.2761),
+    device="cuda",
+    return_steps=False,
+    seed=42,
+):
+    """
+    Get CIFAR100 loaders that are preloaded onto a device.
+
+    Args:
+        root (string): Root directory of dataset.
+        batch_size (int, optional): Number of samples per batch.
+        val_size (float, optional): If float, should be between 0.0 and 1.0
+        and represent the proportion of the dataset to include in the validation split.
+        shuffle (bool, optional): If True, the data will be split randomly.
+        img_size (int, optional): Size the batches are resized to.
+        mean (sequence, optional): Per-channel mean used for normalization.
+        std (sequence, optional): Per-channel std used for normalization.
+        device (string or torch.device, optional): Device to preload onto.
+        return_steps (bool, optional): If True, return number of steps per
+        epoch (over the whole split, i.e. not divided by the number of processes).
+        seed (int, optional): Seed of the cached train/val split and shuffling.
+
+    Returns:
+        tuple: (train_loader, val_loader, test_loader)
+    """
+    kwargs = dict(
+        batch_size=batch_size, img_size=img_size, mean=mean, std=std, device=device
+    )
+
+    # each split is uploaded from the memory-mapped cache once, the loaders
+    # index into it on the device
+    train_set = CIFAR100(root, train=True)
+    test_set = CIFAR100(root, train=False)
+
+    train_data = train_set.data_t.to(device)
+    train_labels = train_set.labels.to(device)
+    if val_size > 0.0:
+        train_indices, val_indices = _get_split_indices(
+            root, len(train_set), val_size, seed
+        )
+        train_indices, val_indices = train_indices.to(device), val_indices.to(device)
+        val_loader = GPUCIFAR100(
+            train_data[val_indices], train_labels[val_indices], **kwargs
+        )
+        train_data, train_labels = (
+            train_data[train_indices],
+            train_labels[train_indices],
+        )
+    else:
+        val_loader = None
+
+    train_loader = GPUCIFAR100(
+        train_data,
+        train_labels,
+        shuffle=shuffle,
+        augment=True,
+        drop_last=True,
+        seed=seed,
+        **kwargs,
+    )
+    test_loader = GPUCIFAR100(test_set.data_t, test_set.labels, **kwargs)
+
+    if return_steps:
+        steps_per_epoch = len(train_loader.data) // batch_size
+        return train_loader, val_loader, test_loader, steps_per_epoch
+    else:
+        return train_loader, val_loader, test_loader
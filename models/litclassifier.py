@@ -10,22 +10,92 @@ from typing import Tuple
 import lightning as pl
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
 import torch.optim.lr_scheduler as lr_scheduler
 import torchmetrics
+import torchvision.transforms.v2.functional as TF
+from lightning_utilities.core.apply_func import apply_to_collection
 from torch import nn, optim
+from torchvision.io import ImageReadMode, decode_jpeg
+
+from utils import BatchAugment
 
 
 class ImageClassifier(pl.LightningModule):
     def __init__(self, model: nn.Module, cfg: dict):
         super().__init__()
+        if cfg.get("compile", False):
+            # in-place compile keeps the state_dict keys (no `_orig_mod.` prefix)
+            model.compile(mode="reduce-overhead", fullgraph=False, dynamic=False)
         self.model = model
         self.cfg = cfg
-        self.loss = nn.CrossEntropyLoss()
+
+        # with the "gpu" transform set or GPU decoding, batches arrive as raw
+        # uint8 tensors
+        if cfg.get("transform_set") == "gpu" or cfg.get("gpu_decode", False):
+            self.gpu_aug = BatchAugment(cfg.img_size, cfg.mean, cfg.std)
+        else:
+            self.gpu_aug = None
+
+        # running means kept on-device, reduced and logged once per epoch
+        self.val_loss = torchmetrics.MeanMetric()
+        self.val_acc = torchmetrics.MeanMetric()
+        self.test_acc = torchmetrics.MeanMetric()
+
+        # side stream for host-to-device copies, created on first use
+        self.copy_stream = None
+
+    def on_before_batch_transfer(self, batch, dataloader_idx: int):
+        x, y = batch
+        if isinstance(x, (tuple, list)):
+            # encoded JPEG bytes (see encoded_collate), decoded in one call
+            data, lengths = x
+            x = list(torch.split(data, lengths.tolist()))
+            x = decode_jpeg(x, mode=ImageReadMode.RGB, device=self.device)
+            size = [self.cfg.img_size, self.cfg.img_size]
+            x = torch.stack(
+                [
+                    img if list(img.shape[-2:]) == size else TF.resize(img, size)
+                    for img in x
+                ]
+            )
+        return x, y
+
+    def transfer_batch_to_device(self, batch, device, dataloader_idx: int):
+        if device.type != "cuda":
+            return super().transfer_batch_to_device(batch, device, dataloader_idx)
+
+        # copy (non_blocking, from pinned memory) on a side stream so it can
+        # overlap with compute still queued on the default stream
+        if self.copy_stream is None:
+            self.copy_stream = torch.cuda.Stream(device)
+        with torch.cuda.stream(self.copy_stream):
+            batch = super().transfer_batch_to_device(batch, device, dataloader_idx)
+
+        current_stream = torch.cuda.current_stream(device)
+        current_stream.wait_stream(self.copy_stream)
+        # the copies were allocated on the side stream but are used on this one
+        apply_to_collection(
+            batch, torch.Tensor, lambda t: t.record_stream(current_stream)
+        )
+        return batch
+
+    def on_after_batch_transfer(self, batch, dataloader_idx: int):
+        x, y = batch
+        if self.gpu_aug is not None and x.dtype == torch.uint8:
+            x = self.gpu_aug(x)
+        return x, y
 
     def forward(self, x: torch.Tensor):
+        x = x.to(memory_format=torch.channels_last)
         return self.model(x)
 
+    def loss(self, y_hat: torch.Tensor, y: torch.Tensor):
+        return F.cross_entropy(
+            y_hat, y, label_smoothing=self.cfg.get("label_smoothing", 0.0)
+        )
+
     def training_step(self, batch: Tuple[torch.Tensor, torch.Tensor], batch_idx: int):
         x, y = batch
         y_hat = self(x)
@@ -37,14 +107,28 @@ class ImageClassifier(pl.LightningModule):
         x, y = batch
         y_hat = self(x)
         loss = self.loss(y_hat, y)
-        self.log("val_loss", loss, prog_bar=True)
+        self.val_loss.update(loss, weight=y.numel())
+        self.log(
+            "val_loss",
+            self.val_loss,
+            prog_bar=True,
+            on_step=False,
+            on_epoch=True,
+            sync_dist=False,
+        )
 
         # calculate accuracy
-        _, preds = torch.max(y_hat, dim=1)
-        acc = torchmetrics.functional.accuracy(
-            preds, y, num_classes=100, task="multiclass"
+        preds = y_hat.argmax(dim=1)
+        acc = (preds == y).float().mean()
+        self.val_acc.update(acc, weight=y.numel())
+        self.log(
+            "val_acc",
+            self.val_acc,
+            prog_bar=True,
+            on_step=False,
+            on_epoch=True,
+            sync_dist=False,
         )
-        self.log("val_acc", acc, prog_bar=True, sync_dist=True)
 
         return loss
 
@@ -53,14 +137,23 @@ class ImageClassifier(pl.LightningModule):
         y_hat = self(x)
 
         # calculate accuracy
-        _, preds = torch.max(y_hat, dim=1)
-        acc = torchmetrics.functional.accuracy(
-            preds, y, num_classes=100, task="multiclass"
+        preds = y_hat.argmax(dim=1)
+        acc = (preds == y).float().mean()
+        self.test_acc.update(acc, weight=y.numel())
+        self.log(
+            "test_acc",
+            self.test_acc,
+            prog_bar=True,
+            on_step=False,
+            on_epoch=True,
+            sync_dist=False,
         )
-        self.log("test_acc", acc, prog_bar=True, sync_dist=True)
 
     def configure_optimizers(self):
-        optimizer = optim.AdamW(self.parameters(), lr=self.cfg.lr)
+        # fused kernels need the parameters on CUDA
+        optimizer = optim.AdamW(
+            self.parameters(), lr=self.cfg.lr, fused=self.device.type == "cuda"
+        )
         scheduler = lr_scheduler.OneCycleLR(
             optimizer,
             max_lr=self.cfg.lr,
@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+import unittest
+
+import torch
+
+from utils import BatchAugment, random_crop_flip
+
+
+class TestRandomCropFlip(unittest.TestCase):
+    def test_shape(self):
+        x = torch.randn(8, 3, 32, 32)
+        out = random_crop_flip(x, padding=4)
+        self.assertEqual(out.shape, x.shape)
+
+    def test_no_padding(self):
+        x = torch.randn(8, 3, 5, 7)
+        out = random_crop_flip(x, padding=0)
+        for i in range(len(x)):
+            self.assertTrue(
+                torch.equal(out[i], x[i]) or torch.equal(out[i], x[i].flip(2))
+            )
+
+
+class TestBatchAugment(unittest.TestCase):
+    def setUp(self):
+        self.aug = BatchAugment(64, [0.5, 0.5, 0.5], [0.25, 0.25, 0.25])
+
+    def test_train(self):
+        x = torch.randint(0, 256, (4, 3, 32, 32), dtype=torch.uint8)
+        out = self.aug.train()(x)
+        self.assertEqual(out.shape, (4, 3, 64, 64))
+        self.assertEqual(out.dtype, torch.float32)
+
+    def test_eval(self):
+        x = torch.full((2, 3, 64, 64), 255, dtype=torch.uint8)
+        out = self.aug.eval()(x)
+        self.assertTrue(torch.allclose(out, torch.full_like(out, 2.0)))
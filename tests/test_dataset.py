@@ -0,0 +1,336 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+import pickle
+import tempfile
+from multiprocessing.reduction import ForkingPickler
+import unittest
+from unittest import mock
+
+import numpy as np
+import torch
+from torchvision.io import decode_jpeg, write_jpeg
+
+from config import get_config
+from data import (
+    CIFAR100,
+    EncodedImageFolder,
+    GPUCIFAR100,
+    get_cifar100_dataset,
+    get_cifar100_loaders,
+)
+from utils import encoded_collate, get_transforms
+
+
+def make_fake_cifar100(root, num_train=20, num_test=10):
+    base = os.path.join(root, "cifar-100-python")
+    os.makedirs(base)
+    rng = np.random.default_rng(0)
+
+    for name, n in (("train", num_train), ("test", num_test)):
+        entry = {
+            "data": rng.integers(0, 256, size=(n, 3072), dtype=np.uint8),
+            "fine_labels": rng.integers(0, 100, size=n).tolist(),
+        }
+        with open(os.path.join(base, name), "wb") as f:
+            pickle.dump(entry, f)
+
+    with open(os.path.join(base, "meta"), "wb") as f:
+        pickle.dump({"fine_label_names": [str(i) for i in range(100)]}, f)
+
+
+class TestCIFAR100(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        make_fake_cifar100(self.root)
+
+        path = os.path.join(self.root, "cifar-100-python", "train")
+        with open(path, "rb") as f:
+            self.entry = pickle.load(f, encoding="latin1")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_npy_cache(self):
+        dataset = CIFAR100(self.root, train=True)
+        base = os.path.join(self.root, "cifar-100-python")
+        self.assertTrue(os.path.exists(os.path.join(base, "train.npy")))
+        self.assertTrue(os.path.exists(os.path.join(base, "train_labels.npy")))
+        data = np.load(os.path.join(base, "train.npy"), mmap_mode="r")
+        self.assertEqual(data.dtype, np.uint8)
+        self.assertTrue(data.flags["C_CONTIGUOUS"])
+        self.assertFalse([f for f in os.listdir(base) if f.endswith(".tmp")])
+
+    def test_shared_memory(self):
+        # without workers, the memory-mapped cache is used as is
+        dataset = CIFAR100(self.root, train=True)
+        self.assertFalse(dataset.data_t.is_shared())
+
+        loaders = get_cifar100_loaders(self.root, None, None, num_workers=2)
+        self.assertTrue(loaders[0].dataset.dataset.data_t.is_shared())
+
+        dataset = CIFAR100(self.root, train=True, share_memory=True)
+        self.assertTrue(dataset.data_t.is_shared())
+        self.assertTrue(dataset.labels.is_shared())
+        self.assertEqual(dataset.labels.dtype, torch.long)
+
+        # the images are passed by file descriptor, not pickled
+        pickled = ForkingPickler.dumps(dataset)
+        self.assertLess(len(pickled), dataset.data_t.nbytes // 10)
+
+    def test_layout(self):
+        dataset = CIFAR100(self.root, train=True)
+        expected = self.entry["data"].reshape(-1, 3, 32, 32).transpose(0, 2, 3, 1)
+        self.assertEqual(len(dataset), 20)
+        self.assertEqual(dataset.data_t.shape, (20, 32, 32, 3))
+        np.testing.assert_array_equal(dataset.data_t.numpy(), expected)
+        np.testing.assert_array_equal(dataset.labels, self.entry["fine_labels"])
+
+    def test_getitem(self):
+        dataset = CIFAR100(self.root, train=False)
+        img, target = dataset[0]
+        self.assertEqual(img.shape, (3, 32, 32))
+        self.assertEqual(img.dtype, torch.uint8)
+        self.assertEqual(target.dim(), 0)
+        self.assertEqual(target.dtype, torch.long)
+
+    def test_transform(self):
+        cfg = get_config()
+        cfg.img_size = 32
+        cfg.mean = [0.5071, 0.4867, 0.4408]
+        cfg.std = [0.2675, 0.2565, 0.2761]
+
+        for transform_set in ("default", "basic"):
+            cfg.transform_set = transform_set
+            _, test_transform = get_transforms(cfg)
+            self.assertIs(get_transforms(cfg)[1], test_transform)
+            dataset = CIFAR100(self.root, train=False, transform=test_transform)
+            img, _ = dataset[0]
+            self.assertEqual(img.shape, (3, 32, 32))
+            self.assertEqual(img.dtype, torch.float32)
+
+    def test_strip_conversions(self):
+        cfg = get_config()
+        cfg.img_size = 32
+        cfg.mean = [0.5071, 0.4867, 0.4408]
+        cfg.std = [0.2675, 0.2565, 0.2761]
+        _, test_transform = get_transforms(cfg)
+
+        dataset = CIFAR100(self.root, train=False, transform=test_transform)
+        self.assertEqual(
+            len(dataset.transform.transforms), len(test_transform.transforms) - 2
+        )
+        img, _ = dataset[0]
+        expected = test_transform(dataset.data_t[0].permute(2, 0, 1))
+        self.assertTrue(torch.allclose(img, expected))
+
+        cfg.transform_set = "gpu"
+        _, test_transform = get_transforms(cfg)
+        dataset = CIFAR100(self.root, train=False, transform=test_transform)
+        self.assertIsNone(dataset.transform)
+
+    def test_split(self):
+        train, val, _ = get_cifar100_dataset(self.root, val_size=0.25, seed=0)
+        self.assertTrue(os.path.exists(os.path.join(self.root, "val_split.pt")))
+        self.assertEqual((len(train), len(val)), (15, 5))
+        self.assertFalse(set(train.indices) & set(val.indices))
+
+        train2, val2, _ = get_cifar100_dataset(self.root, val_size=0.25, seed=0)
+        self.assertEqual(train.indices, train2.indices)
+        self.assertEqual(val.indices, val2.indices)
+
+    def test_atomic_save(self):
+        get_cifar100_dataset(self.root, val_size=0.25, seed=0)
+        # the cache is written to a temporary file and renamed into place
+        self.assertFalse([f for f in os.listdir(self.root) if f.endswith(".tmp")])
+
+        with mock.patch("torch.save", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                get_cifar100_dataset(self.root, val_size=0.25, seed=1)
+        self.assertFalse([f for f in os.listdir(self.root) if f.endswith(".tmp")])
+        split = torch.load(os.path.join(self.root, "val_split.pt"))
+        self.assertEqual(split["seed"], 0)
+
+    def test_cache_mode(self):
+        CIFAR100(self.root, train=True)
+        get_cifar100_dataset(self.root, val_size=0.25, seed=0)
+
+        # the caches get the same mode as a file created with open()
+        reference = os.path.join(self.root, "reference")
+        open(reference, "wb").close()
+        expected = os.stat(reference).st_mode
+        base = os.path.join(self.root, "cifar-100-python")
+        for path in (
+            os.path.join(base, "train.npy"),
+            os.path.join(base, "train_labels.npy"),
+            os.path.join(self.root, "val_split.pt"),
+        ):
+            self.assertEqual(os.stat(path).st_mode, expected)
+
+
+class TestGPUCIFAR100(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        make_fake_cifar100(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iter(self):
+        loader = GPUCIFAR100.from_root(
+            self.root, batch_size=8, shuffle=True, device="cpu"
+        )
+        batches = list(loader)
+        self.assertEqual(len(loader), 3)
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(batches[0][0].shape, (8, 3, 32, 32))
+        self.assertEqual(batches[-1][0].shape, (4, 3, 32, 32))
+        self.assertEqual(batches[0][0].dtype, torch.float32)
+        self.assertEqual(batches[0][1].dtype, torch.long)
+
+    def test_augment(self):
+        loader = GPUCIFAR100.from_root(
+            self.root,
+            batch_size=8,
+            augment=True,
+            img_size=64,
+            indices=range(16),
+            drop_last=True,
+            device="cpu",
+        )
+        self.assertEqual(len(loader), 2)
+        for x, y in loader:
+            self.assertEqual(x.shape, (8, 3, 64, 64))
+            self.assertEqual(y.shape, (8,))
+
+    def test_padding(self):
+        data = torch.full((64, 32, 32, 3), 255, dtype=torch.uint8)
+        mean, std = torch.tensor([0.5, 0.4, 0.3]), torch.tensor([0.2, 0.25, 0.3])
+        loader = GPUCIFAR100(
+            data,
+            torch.zeros(64),
+            batch_size=64,
+            augment=True,
+            mean=mean,
+            std=std,
+            device="cpu",
+        )
+        x, _ = next(iter(loader))
+
+        # the crop pads with black, like BatchAugment
+        white = ((1 - mean) / std).view(1, 3, 1, 1)
+        black = (-mean / std).view(1, 3, 1, 1)
+        is_white = torch.isclose(x, white.expand_as(x))
+        is_black = torch.isclose(x, black.expand_as(x))
+        self.assertTrue((is_white | is_black).all())
+        self.assertTrue(is_black.any())
+
+    def test_shard(self):
+        data = torch.randint(0, 256, (21, 32, 32, 3), dtype=torch.uint8)
+        labels = torch.arange(21)
+
+        # 21 samples over 2 processes: 11 + 10, or 10 + 10 without the tail
+        for drop_last, sizes in ((False, [11, 10]), (True, [10, 10])):
+            shards = []
+            for rank in range(2):
+                env = {"RANK": str(rank), "WORLD_SIZE": "2"}
+                with mock.patch.dict(os.environ, env):
+                    loader = GPUCIFAR100(
+                        data,
+                        labels,
+                        batch_size=5,
+                        shuffle=True,
+                        drop_last=drop_last,
+                        device="cpu",
+                    )
+                    shards.append(torch.cat([y for _, y in loader]).tolist())
+
+            self.assertEqual([len(shard) for shard in shards], sizes)
+            self.assertFalse(set(shards[0]) & set(shards[1]))
+
+
+class TestEncodedImageFolder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for label in ("a", "b"):
+            os.makedirs(os.path.join(self.root, label))
+            for i in range(3):
+                img = torch.randint(0, 256, (3, 16, 16), dtype=torch.uint8)
+                write_jpeg(img, os.path.join(self.root, label, f"{i}.jpg"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_index_cache(self):
+        dataset = EncodedImageFolder(self.root)
+        self.assertTrue(os.path.exists(os.path.join(self.root, "index.pt")))
+        cached = EncodedImageFolder(self.root)
+        self.assertEqual(len(cached), 6)
+        self.assertEqual(cached.classes, ["a", "b"])
+        self.assertEqual(cached.samples, dataset.samples)
+
+    def test_index_rescan(self):
+        EncodedImageFolder(self.root)
+        img = torch.randint(0, 256, (3, 16, 16), dtype=torch.uint8)
+        class_dir = os.path.join(self.root, "b")
+        write_jpeg(img, os.path.join(class_dir, "3.jpg"))
+        # make sure the change is visible on filesystems with coarse mtimes
+        mtime = os.stat(class_dir).st_mtime_ns + 10**9
+        os.utime(class_dir, ns=(mtime, mtime))
+
+        dataset = EncodedImageFolder(self.root)
+        self.assertEqual(len(dataset), 7)
+        self.assertEqual(dataset.samples[-1], (os.path.join("b", "3.jpg"), 1))
+
+    def test_collate(self):
+        dataset = EncodedImageFolder(self.root)
+        (data, lengths), targets = encoded_collate([dataset[0], dataset[5]])
+        self.assertEqual(data.dtype, torch.uint8)
+        self.assertEqual(data.dim(), 1)
+        self.assertEqual(lengths.sum().item(), len(data))
+        self.assertEqual(targets.tolist(), [0, 1])
+        first = data[: lengths[0]]
+        self.assertEqual(decode_jpeg(first).shape, (3, 16, 16))
+
+
+class TestImageFolderGPUTransforms(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for split in ("train", "test"):
+            for label in ("a", "b"):
+                os.makedirs(os.path.join(self.root, split, label))
+                for i, size in enumerate((16, 20, 24)):
+                    img = torch.randint(0, 256, (3, size, size), dtype=torch.uint8)
+                    path = os.path.join(self.root, split, label, f"{i}.jpg")
+                    write_jpeg(img, path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_mixed_sizes(self):
+        cfg = get_config()
+        cfg.transform_set = "gpu"
+        cfg.dataset_type = "imagefolder"
+        cfg.img_size = 32
+        cfg.mean = [0.5, 0.5, 0.5]
+        cfg.std = [0.25, 0.25, 0.25]
+        train_transform, test_transform = get_transforms(cfg)
+
+        loaders = get_cifar100_loaders(
+            self.root,
+            train_transform,
+            test_transform,
+            batch_size=3,
+            num_workers=0,
+            val_size=0.5,
+            dataset_type="imagefolder",
+        )
+        x, y = next(iter(loaders[2]))
+        self.assertEqual(x.shape, (3, 3, 32, 32))
+        self.assertEqual(x.dtype, torch.uint8)
@@ -0,0 +1,92 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+import unittest
+
+import lightning as pl
+import torch
+import torch.nn.functional as F
+from torch import nn
+from torch.utils.data import DataLoader, TensorDataset
+from torchvision.io import encode_jpeg
+
+from config import get_config
+from models import ImageClassifier
+from utils import encoded_collate
+
+
+class TestBatchHooks(unittest.TestCase):
+    def setUp(self):
+        self.cfg = get_config()
+        self.cfg.compile = False
+        self.cfg.gpu_decode = True
+        self.cfg.img_size = 24
+        self.cfg.mean = [0.5, 0.5, 0.5]
+        self.cfg.std = [0.25, 0.25, 0.25]
+        self.model = ImageClassifier(nn.Flatten(), self.cfg)
+
+    def test_encoded_mixed_sizes(self):
+        batch = [
+            (encode_jpeg(torch.randint(0, 256, (3, size, size), dtype=torch.uint8)), i)
+            for i, size in enumerate((16, 20, 24))
+        ]
+        batch = encoded_collate(batch)
+
+        for training in (True, False):
+            self.model.train(training)
+            x, y = self.model.on_before_batch_transfer(batch, 0)
+            self.assertEqual(x.shape, (3, 3, 24, 24))
+            self.assertEqual(x.dtype, torch.uint8)
+
+            x, y = self.model.on_after_batch_transfer((x, y), 0)
+            self.assertEqual(x.shape, (3, 3, 24, 24))
+            self.assertEqual(x.dtype, torch.float32)
+            self.assertEqual(y.tolist(), [0, 1, 2])
+
+
+class TestEpochMetrics(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.cfg = get_config()
+        self.cfg.compile = False
+        self.cfg.transform_set = "default"
+        self.cfg.gpu_decode = False
+        self.cfg.label_smoothing = 0.1
+        self.model = ImageClassifier(
+            nn.Sequential(nn.Flatten(), nn.Linear(48, 5)), self.cfg
+        )
+
+        self.x = torch.randn(23, 3, 4, 4)
+        self.y = torch.randint(0, 5, (23,))
+        # uneven batches (10, 10, 3), so a plain mean of batch values is off
+        self.loader = DataLoader(TensorDataset(self.x, self.y), batch_size=10)
+        self.trainer = pl.Trainer(
+            accelerator="cpu",
+            devices=1,
+            logger=False,
+            enable_checkpointing=False,
+            enable_progress_bar=False,
+            enable_model_summary=False,
+        )
+
+        with torch.no_grad():
+            y_hat = self.model(self.x)
+        self.loss = F.cross_entropy(y_hat, self.y, label_smoothing=0.1).item()
+        self.acc = (y_hat.argmax(dim=1) == self.y).float().mean().item()
+
+    def test_validation(self):
+        for _ in range(2):
+            # the metrics are reset between epochs
+            metrics = self.trainer.validate(self.model, self.loader, verbose=False)[0]
+            self.assertAlmostEqual(metrics["val_loss"], self.loss, places=5)
+            self.assertAlmostEqual(metrics["val_acc"], self.acc, places=5)
+
+    def test_test(self):
+        metrics = self.trainer.test(self.model, self.loader, verbose=False)[0]
+        self.assertAlmostEqual(metrics["test_acc"], self.acc, places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,7 @@ Training script for Pytorch models [Pytorch Lightning]
 
 Usage:
     >>> python train.py --help
-    >>> python train.py --data-dir <path> --model-dir <path> --batch-size <int> --num-workers <int> --num-epochs <int> --lr <float> --rich-progress --accelerator <str> --devices <str> --weights <path> --resume --test-only
+    >>> python train.py --data-dir <path> --model-dir <path> --batch-size <int> --num-workers <int> --gpu-preload --gpu-decode --num-epochs <int> --lr <float> --rich-progress --accelerator <str> --devices <str> --weights <path> --resume --test-only
     
 Example:
     Use the default config:
@@ -30,7 +30,7 @@ from termcolor import colored
 from torchinfo import summary
 
 from config import get_config
-from data import get_cifar100_loaders
+from data import get_cifar100_gpu_loaders, get_cifar100_loaders
 from models import (
     EfficientNetV2,
     ImageClassifier,
@@ -43,7 +43,6 @@ from utils import EMACallback, SimplifiedProgressBar, get_transforms
 
 # Common setup
 warnings.filterwarnings("ignore")
-torch.set_float32_matmul_precision("medium")
 plt.rcParams["font.family"] = "STIXGeneral"
 
 
@@ -74,22 +73,58 @@ def train(
         )
 
     # Instantiate
-    train_transform, test_transform = get_transforms(cfg)
-    (
-        train_dataloader,
-        val_dataloader,
-        test_dataloader,
-        steps_per_epoch,
-    ) = get_cifar100_loaders(
-        cfg.data_dir,
-        train_transform,
-        test_transform,
-        cfg.batch_size,
-        cfg.num_workers,
-        val_size=0.1,
-        dataset_type=cfg.dataset_type,
-        return_steps=True,
-    )
+    if cfg.gpu_preload:
+        if cfg.dataset_type != "default":
+            raise ValueError(
+                colored(
+                    "GPU preloading is only supported for the default dataset type",
+                    "red",
+                )
+            )
+        if cfg.transform_set != "gpu" and os.getenv("LOCAL_RANK", "0") == "0":
+            print(
+                colored(
+                    "GPU preloading only applies random crop and flip, "
+                    f"transform set '{cfg.transform_set}' is ignored",
+                    "yellow",
+                )
+            )
+
+        (
+            train_dataloader,
+            val_dataloader,
+            test_dataloader,
+            steps_per_epoch,
+        ) = get_cifar100_gpu_loaders(
+            root=cfg.data_dir,
+            batch_size=cfg.batch_size,
+            val_size=cfg.val_size,
+            img_size=cfg.img_size,
+            mean=cfg.mean,
+            std=cfg.std,
+            device=f"cuda:{os.getenv('LOCAL_RANK', '0')}",
+            return_steps=True,
+            seed=cfg.seed,
+        )
+    else:
+        train_transform, test_transform = get_transforms(cfg)
+        (
+            train_dataloader,
+            val_dataloader,
+            test_dataloader,
+            steps_per_epoch,
+        ) = get_cifar100_loaders(
+            root=cfg.data_dir,
+            train_transform=train_transform,
+            test_transform=test_transform,
+            batch_size=cfg.batch_size,
+            num_workers=cfg.num_workers,
+            val_size=cfg.val_size,
+            dataset_type=cfg.dataset_type,
+            return_steps=True,
+            seed=cfg.seed,
+            decode_on_gpu=cfg.gpu_decode,
+        )
 
     # Divide steps per epoch by number of GPUs
     if devices != "auto":
@@ -97,6 +132,10 @@ def train(
 
     cfg.steps_per_epoch = steps_per_epoch
 
+    # CUDA graphs only pay off (and only work) when training on CUDA
+    if accelerator not in ("auto", "gpu", "cuda") or not torch.cuda.is_available():
+        cfg.compile = False
+
     if mode == "finetune":
         # Create the model
         model = timm.create_model(
@@ -144,11 +183,15 @@ def train(
             device="cpu",
         )
 
+    # NHWC lets cuDNN pick Tensor Core convolution kernels
+    model = model.to(memory_format=torch.channels_last)
     model = ImageClassifier(model, cfg)
 
     # Load from checkpoint if weights are provided
     if weights is not None:
-        model.load_state_dict(torch.load(weights)["state_dict"])
+        # mmap pages tensors in lazily; weights_only refuses arbitrary pickles
+        state = torch.load(weights, map_location="cpu", mmap=True, weights_only=True)
+        model.load_state_dict(state["state_dict"])
 
     if logger_backend == "wandb":
         logger.watch(model, log="all", log_freq=100)
@@ -168,7 +211,7 @@ def train(
         trainer = pl.Trainer(
             accelerator=accelerator,
             devices=devices,
-            precision=16,
+            precision=cfg.precision,
             max_epochs=cfg.num_epochs,
             enable_model_summary=False,
             check_val_every_n_epoch=5,
@@ -188,7 +231,7 @@ def train(
         trainer = pl.Trainer(
             accelerator=accelerator,
             devices=devices,
-            precision=16,
+            precision=cfg.precision,
             max_epochs=cfg.num_epochs,
             enable_model_summary=False,
             check_val_every_n_epoch=5,
@@ -242,6 +285,17 @@ if __name__ == "__main__":
         default=cfg.num_workers,
         help="Number of workers for data loading",
     )
+    parser.add_argument(
+        "--gpu-preload",
+        action="store_true",
+        help="Preload the dataset onto the GPU instead of using DataLoader workers "
+        "(only random crop and flip are applied, the transform set is ignored)",
+    )
+    parser.add_argument(
+        "--gpu-decode",
+        action="store_true",
+        help="Decode JPEG images on the GPU (imagefolder datasets only)",
+    )
     parser.add_argument(
         "--num-epochs",
         type=int,
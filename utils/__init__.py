@@ -1,3 +1,4 @@
+from .augment import *
 from .colors import *
 from .defaults import *
 from .ema import *
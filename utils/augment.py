@@ -0,0 +1,73 @@
+"""
+Batched augmentations that run on the device the batch lives on.
+"""
+
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+
+def random_crop_flip(x, padding=4):
+    """
+    Random crop (with zero padding) and horizontal flip of a whole batch.
+
+    Args:
+        x (torch.Tensor): Batch of images of shape (N, C, H, W).
+        padding (int, optional): Padding added on every side before cropping.
+
+    Returns:
+        torch.Tensor: Augmented batch with the same shape as `x`.
+    """
+    n, c, h, w = x.shape
+    p = padding
+
+    flip = torch.rand(n, device=x.device) < 0.5
+    x = torch.where(flip.view(n, 1, 1, 1), x.flip(3), x)
+
+    x = F.pad(x, (p, p, p, p))
+    top = torch.randint(0, 2 * p + 1, (n, 1, 1, 1), device=x.device)
+    left = torch.randint(0, 2 * p + 1, (n, 1, 1, 1), device=x.device)
+    rows = top + torch.arange(h, device=x.device).view(1, 1, h, 1)
+    cols = left + torch.arange(w, device=x.device).view(1, 1, 1, w)
+    batch = torch.arange(n, device=x.device).view(n, 1, 1, 1)
+    channels = torch.arange(c, device=x.device).view(1, c, 1, 1)
+
+    return x[batch, channels, rows, cols]
+
+
+class BatchAugment(nn.Module):
+    """
+    Resize, augment and normalize a uint8 batch on its device.
+
+    In training mode, a random crop and horizontal flip are applied to the
+    whole batch at once; in eval mode, the batch is only resized and
+    normalized.
+
+    Args:
+        img_size (int): Size the batch is resized to.
+        mean (sequence): Per-channel mean used for normalization.
+        std (sequence): Per-channel std used for normalization.
+        padding (int, optional): Padding used by the random crop.
+    """
+
+    def __init__(self, img_size, mean, std, padding=4):
+        super().__init__()
+        self.img_size = img_size
+        self.padding = padding
+        self.register_buffer(
+            "mean", torch.tensor(mean).view(1, -1, 1, 1), persistent=False
+        )
+        self.register_buffer(
+            "std", torch.tensor(std).view(1, -1, 1, 1), persistent=False
+        )
+
+    @torch.no_grad()
+    def forward(self, x: torch.Tensor):
+        x = x.float().div_(255)
+
+        if self.training:
+            x = random_crop_flip(x, self.padding)
+        if x.shape[-2:] != (self.img_size, self.img_size):
+            x = F.interpolate(x, size=(self.img_size, self.img_size), mode="bicubic")
+
+        return x.sub_(self.mean).div_(self.std)
@@ -23,15 +23,60 @@ def numpy_collate(batch):
         return np.array(batch)
 
 
+def encoded_collate(batch):
+    """
+    Collate function for datasets returning encoded images (e.g. JPEG bytes).
+
+    The encoded images differ in length, so they are concatenated into one
+    flat uint8 buffer (a single shared-memory transfer out of the worker)
+    along with their lengths; targets are stacked.
+
+    Returns:
+        tuple: ((data, lengths), targets)
+    """
+    data, targets = zip(*batch)
+    lengths = torch.tensor([len(d) for d in data])
+    return (torch.cat(data), lengths), torch.as_tensor(targets)
+
+
+_TRANSFORM_CACHE = {}
+
+
 def get_transforms(cfg):
     """
     Get transforms for dataset.
 
+    Only the requested transform set is built, and it is cached per
+    (transform_set, dataset_type, img_size, mean, std), so repeated calls
+    return the same objects.
+
     Returns:
         tuple: (train_transform, test_transform)
     """
+    key = (
+        cfg.transform_set,
+        cfg.dataset_type,
+        cfg.img_size,
+        tuple(cfg.mean),
+        tuple(cfg.std),
+    )
+    if key in _TRANSFORM_CACHE:
+        return _TRANSFORM_CACHE[key]
+
+    # the "gpu" set leaves resizing to the GPU, except for imagefolder images,
+    # which may differ in size and must match to be collated into a batch
+    if cfg.dataset_type == "imagefolder":
+        gpu_resize = [
+            v2.Resize(
+                (cfg.img_size, cfg.img_size),
+                interpolation=v2.InterpolationMode.BICUBIC,
+            )
+        ]
+    else:
+        gpu_resize = []
+
     transform_dict = {
-        "default": (
+        "default": lambda: (
             v2.Compose(
                 [
                     v2.ToImage(),
@@ -63,7 +108,7 @@ def get_transforms(cfg):
                 ]
             ),
         ),
-        "imagenet": (
+        "imagenet": lambda: (
             v2.Compose(
                 [
                     v2.ToImage(),
@@ -90,7 +135,7 @@ def get_transforms(cfg):
                 ]
             ),
         ),
-        "cifar": (
+        "cifar": lambda: (
             v2.Compose(
                 [
                     v2.ToImage(),
@@ -117,7 +162,7 @@ def get_transforms(cfg):
                 ]
             ),
         ),
-        "svhn": (
+        "svhn": lambda: (
             v2.Compose(
                 [
                     v2.ToImage(),
@@ -144,9 +189,46 @@ def get_transforms(cfg):
                 ]
             ),
         ),
+        # tensor-only pipeline, expects uint8 (C, H, W) tensors (e.g. CIFAR100)
+        "basic": lambda: (
+            v2.Compose(
+                [
+                    v2.Resize(
+                        (cfg.img_size, cfg.img_size),
+                        interpolation=v2.InterpolationMode.BICUBIC,
+                    ),
+                    v2.RandomCrop(cfg.img_size, padding=cfg.img_size // 8),
+                    v2.RandomHorizontalFlip(),
+                    v2.ToDtype(torch.float32, scale=True),
+                    v2.Normalize(mean=cfg.mean, std=cfg.std),
+                ]
+            ),
+            v2.Compose(
+                [
+                    v2.Resize(
+                        (cfg.img_size, cfg.img_size),
+                        interpolation=v2.InterpolationMode.BICUBIC,
+                    ),
+                    v2.ToDtype(torch.float32, scale=True),
+                    v2.Normalize(mean=cfg.mean, std=cfg.std),
+                ]
+            ),
+        ),
+        # only converts to uint8 tensors, augmentation runs on the GPU
+        # (see ImageClassifier.on_after_batch_transfer)
+        "gpu": lambda: (
+            v2.Compose(
+                [v2.ToImage(), *gpu_resize, v2.ToDtype(torch.uint8, scale=True)]
+            ),
+            v2.Compose(
+                [v2.ToImage(), *gpu_resize, v2.ToDtype(torch.uint8, scale=True)]
+            ),
+        ),
     }
 
-    return transform_dict[cfg.transform_set]
+    transforms = transform_dict[cfg.transform_set]()
+    _TRANSFORM_CACHE[key] = transforms
+    return transforms
 
 
 class SimplifiedProgressBar(TQDMProgressBar):